@@ -79,6 +79,16 @@ logger = logging.getLogger(__name__)
     The path where the final report files will be generated
     """
 )
+@option(
+    "--cache-file",
+    "-c",
+    "cache_file",
+    help="""
+    The json file to keep the ETag and sha1 of the validated artifacts and
+    their checksum files. If specified, files that are not changed since the
+    last validation with the same cache file will not be downloaded again.
+    """
+)
 @option(
     "--includes",
     "-i",
@@ -107,6 +117,7 @@ def validate(
     includes: List[str],
     report_file_path: str,
     skips: List[str],
+    cache_file: str = None,
     recursive: bool = False,
     quiet: bool = False,
     debug: bool = False
@@ -139,7 +150,8 @@ def validate(
         if path == "/":
             root_path = prefix
         handle_checksum_validation_http(
-            aws_bucket, root_path, includes, report_file_path, recursive, skip_paths
+            aws_bucket, root_path, includes, report_file_path,
+            recursive, skip_paths, cache_file
         )
     except Exception:
         print(traceback.format_exc())
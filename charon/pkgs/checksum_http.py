@@ -13,20 +13,71 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
-from charon.utils.files import digest, HashType
+from charon.utils.files import digest_all, HashType
 from charon.storage import S3Client
-from typing import Tuple, List, Dict
-from html.parser import HTMLParser
+from typing import Tuple, List, Dict, FrozenSet, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 import tempfile
+import csv
+import functools
+import hashlib
+import html
+import json
 import os
 import logging
 import requests
 import shutil
+import re
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_ARTIFACT_TYPES = ['.pom', '.jar', '.war', '.ear', '.zip', '.tar', '.gz', '.xml']
 
+_BUCKET_ROOT_URLS = (
+    ("prod-maven", "https://maven.repository.redhat.com"),
+    ("stage-maven", "https://maven.stage.repository.redhat.com")
+)
+
+LISTING_WORKERS = 16
+VALIDATION_WORKERS = 64
+# Every worker of the listing and validation pools can hold a connection
+HTTP_POOL_SIZE = LISTING_WORKERS + VALIDATION_WORKERS
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+REPORT_BUFFER_SIZE = 1024 * 1024
+
+# The folder index pages are plain lists of links, so compiled patterns
+# are enough to get the links out of them without a full html parsing.
+# Like the html parser, the comments are skipped, the quoted attribute
+# values can contain ">" and the values can also be unquoted
+_A_TAG_PATTERN = re.compile(
+    r'<!--.*?-->|<a\s((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>', re.IGNORECASE | re.DOTALL
+)
+_ATTR_PATTERN = re.compile(
+    r'([^\s/=>]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]*)))?'
+)
+
+
+def _init_http_session() -> requests.Session:
+    # One shared session for all the validation requests, so the keep-alive
+    # connections to the repository are reused instead of doing a new
+    # DNS lookup and TCP + TLS handshake for every file
+    http_session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=Retry(total=3, backoff_factor=0.2)
+    )
+    for scheme in ["https://", "http://"]:
+        http_session.mount(scheme, adapter)
+    return http_session
+
+
+_SESSION = _init_http_session()
+
 
 def handle_checksum_validation_http(
     bucket: str,
@@ -34,7 +85,8 @@ def handle_checksum_validation_http(
     includes: str,
     report_file_path: str,
     recursive: bool = False,
-    skips: List[str] = None
+    skips: List[str] = None,
+    cache_file: str = None
 ):
     """ Handle the checksum check for maven artifacts.
         * bucket contains store artifacts with the prefix. See target
@@ -46,22 +98,27 @@ def handle_checksum_validation_http(
           Becareful to set true because it will be very time-consuming to do the
           recursive validation as it will recursively scan all sub paths in
           the path.
+        * cache_file is a json file to keep the ETag and sha1 of validated
+          artifacts and their checksum files between runs. With it, files
+          which are not changed since last run will not be downloaded again.
 
         This will generate a file contains all artifacts which mismatched with its
         checksum files. Will use sha1 to do the validation.
     """
-    local_dir = tempfile.mkdtemp()
     results = ([], [], [])
+    cache = _load_validation_cache(cache_file)
     try:
-        if not os.path.exists(local_dir):
-            os.makedirs(local_dir)
         root_url = _decide_root_url(bucket)
+        if not root_url:
+            logger.error("Can not decide the repository url for bucket %s", bucket)
+            return
+        root_url = root_url.rstrip("/")
         logger.debug("Root url is %s", root_url)
         _collect_invalid_files(
-            root_url, path, includes, local_dir, recursive, skips, results
+            root_url, path, includes, recursive, frozenset(skips or ()), results, cache
         )
     finally:
-        shutil.rmtree(local_dir)
+        _save_validation_cache(cache_file, cache)
         if results and any([
             results[0] and len(results[0]) > 0,
             results[1] and len(results[1]) > 0,
@@ -74,18 +131,51 @@ def _collect_invalid_files(
     root_url: str,
     path: str,
     includes: str,
-    work_dir: str,
     recursive: bool,
-    skips: List[str],
-    results: Tuple[List[str], List[str], List[Dict[str, str]]]
+    skips: FrozenSet[str],
+    results: Tuple[List[str], List[str], List[Dict[str, str]]],
+    cache: Dict[str, Dict[str, str]]
 ):
-    if skips and path in skips:
-        logger.info("Path %s is in skips list, will not check it", path)
-        return
-    logger.info("Validating path %s", path)
+    include_types = DEFAULT_ARTIFACT_TYPES
+    if includes and includes.strip() != "":
+        include_types = includes.split(",")
+    # str.endswith matches all the suffixes of a tuple in one call
+    include_suffixes = tuple(include_types)
+
+    # Both folder listing and file validation are network bound. Folders are
+    # listed in their own pool so the listings of sub folders are not queued
+    # behind slow validations, and the files found are validated in parallel.
+    with ThreadPoolExecutor(max_workers=LISTING_WORKERS) as listing_pool, \
+         ThreadPoolExecutor(max_workers=VALIDATION_WORKERS) as validation_pool:
+        listings: Dict[Future, str] = {}
+
+        def submit_listing(folder: str):
+            if folder in skips:
+                logger.info("Path %s is in skips list, will not check it", folder)
+                return
+            logger.info("Validating path %s", folder)
+            listings[listing_pool.submit(_list_folder_items, root_url, folder)] = folder
+
+        submit_listing(path)
+        while listings:
+            done, _ = wait(listings, return_when=FIRST_COMPLETED)
+            for listing in done:
+                listings.pop(listing)
+                (sub_folders, files) = listing.result()
+                for f in files:
+                    if f.endswith(include_suffixes):
+                        validation_pool.submit(
+                            _do_validation_safely, root_url, f, results, cache
+                        )
+                if recursive:
+                    for folder in sub_folders:
+                        submit_listing(folder)
+
 
+def _list_folder_items(root_url: str, path: str) -> Tuple[List[str], List[str]]:
+    sub_folders, files = [], []
     try:
-        folder_url = os.path.join(root_url, path)
+        folder_url = _urljoin(root_url, path)
         items = _list_folder_content(folder_url, path)
         sub_folders = [item for item in items if item.endswith("/")]
         files = [item for item in items if not item.endswith("/")]
@@ -93,55 +183,59 @@ def _collect_invalid_files(
             sub_folders.remove(path+"/")
         logger.debug("Folders in path %s: %s", path, sub_folders)
         logger.debug("Files in path %s: %s", path, files)
-        include_types = DEFAULT_ARTIFACT_TYPES
-        if includes and includes.strip() != "":
-            include_types = includes.split(",")
-        for f in files:
-            if any(f.endswith(filetype) for filetype in include_types):
-                _do_validation(root_url, f, work_dir, results)
     except Exception as e:
         logger.error("Error happened during checking path %s: %s", path, e)
-    if recursive:
-        for folder in sub_folders:
-            _collect_invalid_files(root_url, folder, includes, work_dir, recursive, skips, results)
+    return (sub_folders, files)
+
+
+def _do_validation_safely(
+    root_url: str, file: str,
+    results: Tuple[List[str], List[str], List[Dict[str, str]]],
+    cache: Dict[str, Dict[str, str]]
+):
+    # Single file failure should not stop the validation of other files
+    try:
+        _do_validation(root_url, file, results, cache)
+    except Exception as e:
+        logger.error("Error happened during checking file %s: %s", file, e)
 
 
 def _do_validation(
-    root_url: str, file: str, work_dir: str,
-    results: Tuple[List[str], List[str], List[Dict[str, str]]]
+    root_url: str, file: str,
+    results: Tuple[List[str], List[str], List[Dict[str, str]]],
+    cache: Dict[str, Dict[str, str]]
 ):
     mismatch_files = results[0]
     missing_checksum_files = results[1]
     error_files = results[2]
     item_path = file
-    checksum_file_url = os.path.join(root_url, item_path + ".sha1")
-    checksum = None
-    if not _remote_file_exists(checksum_file_url):
+    checksum_file_url = _urljoin(root_url, item_path + ".sha1")
+    try:
+        remote_checksum = _read_checksum_file(checksum_file_url, cache)
+    except Exception as e:
+        # Not knowing the checksum is not the same as missing it, so report
+        # the file as an error instead of dropping it from all the reports
+        logger.error("Reading checksum file failed for file %s: %s", item_path, e)
+        error_files.append({"path": item_path, "error": str(e)})
+        return
+    if remote_checksum is None:
         logger.info("Missing checksum file for file %s", item_path)
         missing_checksum_files.append(item_path)
-    else:
-        local_path = os.path.join(work_dir, item_path)
-        try:
-            # At first we want to get checksum from s3 metadata for files, but found it
-            # does not match with the file itself after checking. So here we download
-            # the file itself and do digesting directly
-            _download_file(root_url, item_path, work_dir)
-            checksum = digest(local_path)
-        except Exception as e:
-            logger.error("Validation failed for file %s: %s", item_path, e)
-            error_files.append({"path": item_path, "error": str(e)})
-        finally:
-            if os.path.exists(local_path):
-                os.remove(local_path)
-        if checksum and checksum.strip() != "":
-            remote_checksum = _read_remote_file_content(checksum_file_url)
-            if remote_checksum is None:
-                logger.info("Missing checksum file for file %s", item_path)
-                missing_checksum_files.append(item_path)
-            elif checksum.strip().lower() != remote_checksum.strip().lower():
-                logger.info("""Found mismatched file %s, file checksum %s,
-                            remote checksum: %s""", item_path, checksum, remote_checksum)
-                mismatch_files.append(item_path)
+        return
+    checksum = None
+    try:
+        # At first we want to get checksum from s3 metadata for files, but found it
+        # does not match with the file itself after checking. So here we download
+        # the file itself and do digesting directly
+        checksum = _download_and_digest(_urljoin(root_url, item_path), cache)
+    except Exception as e:
+        logger.error("Validation failed for file %s: %s", item_path, e)
+        error_files.append({"path": item_path, "error": str(e)})
+    if checksum and checksum.strip() != "":
+        if checksum.strip().lower() != remote_checksum.lower():
+            logger.info("""Found mismatched file %s, file checksum %s,
+                        remote checksum: %s""", item_path, checksum, remote_checksum)
+            mismatch_files.append(item_path)
 
 
 def _gen_report(
@@ -166,12 +260,14 @@ def _gen_report(
         if os.path.isfile(file_name):
             os.remove(file_name)
 
+    # The rows are collected in the completion order of the validations,
+    # sort them to make the reports stable between runs
     def _write_one_col_file(items: List[str], file_name: str):
         if items and len(items) > 0:
             _check_and_remove_file(file_name)
-            with open(file_name, "w") as f:
-                for i in items:
-                    f.write(i + "\n")
+            with open(file_name, "w", buffering=REPORT_BUFFER_SIZE) as f:
+                f.write("\n".join(sorted(items)))
+                f.write("\n")
             logger.info("The report file %s is generated.", file_name)
 
     _write_one_col_file(content[0], os.path.join(work_dir, "mismatched_files.csv"))
@@ -180,53 +276,103 @@ def _gen_report(
     if content[2] and len(content[2]) > 0:
         error_file = os.path.join(work_dir, "error_files.csv")
         _check_and_remove_file(error_file)
-        with open(error_file, "w") as f:
-            f.write("path,error\n")
-            for d in content[2]:
-                f.write("{path},{error}\n".format(path=d["path"], error=d["error"]))
+        with open(error_file, "w", newline="", buffering=REPORT_BUFFER_SIZE) as f:
+            # Paths and errors can contain commas, quotes or even new lines,
+            # so let csv writer do the escaping for them
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(["path", "error"])
+            writer.writerows(
+                (d["path"], d["error"]) for d in sorted(content[2], key=lambda d: d["path"])
+            )
         logger.info("The report file %s is generated.", error_file)
 
 
-def _remote_file_exists(file_url: str) -> bool:
-    with requests.head(file_url) as r:
-        if r.status_code == 200:
-            return True
-    return False
-
-
-def _download_file(root_url: str, file_path: str, work_dir: str):
-    file_url = os.path.join(root_url, file_path)
+def _read_checksum_file(
+    checksum_file_url: str, cache: Dict[str, Dict[str, str]]
+) -> Optional[str]:
+    # One GET of the checksum file tells both if it exists and what it contains.
+    # For checksum files the cached "sha1" is the content of the file itself.
+    cached = cache.get(checksum_file_url)
+    headers = {}
+    if cached and cached.get("etag") and "sha1" in cached:
+        headers["If-None-Match"] = cached["etag"]
+    with _SESSION.get(checksum_file_url, headers=headers) as r:
+        if r.status_code == 304:
+            return cached["sha1"]
+        if r.status_code != 200:
+            cache.pop(checksum_file_url, None)
+            return None
+        remote_checksum = r.text.strip() if r.text else ""
+        etag = r.headers.get("ETag")
+    if etag:
+        cache[checksum_file_url] = {"etag": etag, "sha1": remote_checksum}
+    return remote_checksum
+
+
+def _download_and_digest(file_url: str, cache: Dict[str, Dict[str, str]]) -> str:
     logger.debug("Start downloading file %s", file_url)
-    local_filename = os.path.join(work_dir, file_path)
-    local_dir = os.path.dirname(local_filename)
-    if not os.path.exists(local_dir):
-        logger.debug("Creating dir %s", local_dir)
-        os.makedirs(local_dir)
-    # NOTE the stream=True parameter below
+    cached = cache.get(file_url)
+    headers = {}
+    if cached and cached.get("etag") and cached.get("sha1"):
+        # Only download the file again if it changed since last validation
+        headers["If-None-Match"] = cached["etag"]
+    # The content is digested while it is streamed, so it never needs
+    # to be written to disk and read back for the digesting
+    sha1 = hashlib.sha1()
     try:
-        with requests.get(file_url, stream=True) as r:
-            if r.status_code == 200:
-                with open(local_filename, 'wb') as f:
-                    # shutil.copyfileobj(r.raw, f)
-                    for chunk in r.iter_content(chunk_size=8192):
-                        f.write(chunk)
-        logger.debug("Downloaded file %s to %s", file_path, local_filename)
+        with _SESSION.get(file_url, headers=headers, stream=True) as r:
+            if r.status_code == 304:
+                logger.debug("File %s is not changed, use cached sha1", file_url)
+                return cached["sha1"]
+            r.raise_for_status()
+            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                sha1.update(chunk)
+            etag = r.headers.get("ETag")
+        logger.debug("Downloaded and digested file %s", file_url)
     except Exception as e:
-        logger.error("Download file %s failed: %s", file_path, e)
+        logger.error("Download file %s failed: %s", file_url, e)
         raise e
-    return local_filename
+    checksum = sha1.hexdigest()
+    if etag:
+        cache[file_url] = {"etag": etag, "sha1": checksum}
+    return checksum
+
+
+def _load_validation_cache(cache_file: str) -> Dict[str, Dict[str, str]]:
+    if cache_file and os.path.isfile(cache_file):
+        try:
+            with open(cache_file, encoding="utf-8") as f:
+                cache = json.load(f)
+            if isinstance(cache, dict):
+                logger.info("Loaded %d cached checksums from %s", len(cache), cache_file)
+                return cache
+            logger.warning("Cache file %s is not valid, will ignore it", cache_file)
+        except (OSError, ValueError) as e:
+            logger.warning("Can not read cache file %s, will ignore it: %s", cache_file, e)
+    return {}
+
+
+def _save_validation_cache(cache_file: str, cache: Dict[str, Dict[str, str]]):
+    if not cache_file:
+        return
+    try:
+        cache_dir = os.path.dirname(cache_file)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        logger.info("Saved %d cached checksums to %s", len(cache), cache_file)
+    except OSError as e:
+        logger.error("Can not write cache file %s: %s", cache_file, e)
 
 
 def _list_folder_content(folder_url: str, folder_path: str) -> List[str]:
     try:
-        with requests.get(folder_url) as r:
+        with _SESSION.get(folder_url) as r:
             if r.status_code == 200:
                 contentType = r.headers.get('Content-Type')
                 if contentType and "text/html" in contentType:
-                    pageContent = r.text
-                    p = _IndexParser()
-                    p.feed(pageContent)
-                    return p.get_content(folder_path)
+                    return _parse_index_links(r.text, folder_path)
                 else:
                     logger.warning("%s is not a folder!", folder_url)
     except Exception as e:
@@ -234,37 +380,34 @@ def _list_folder_content(folder_url: str, folder_path: str) -> List[str]:
     return []
 
 
-class _IndexParser(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.reset()
-        self.__content = []
-
-    def handle_starttag(self, tag, attrs):
-        if tag == "a":
-            for name, link in attrs:
-                if name == "href" and link.strip() not in ['../', '']:
-                    self.__content.append(link)
-
-    def get_content(self, parent):
-        return [os.path.join(parent, i) for i in self.__content]
+def _parse_index_links(page_content: str, parent: str) -> List[str]:
+    links = []
+    for tag in _A_TAG_PATTERN.finditer(page_content):
+        attrs = tag.group(1)
+        if not attrs:
+            continue
+        for attr in _ATTR_PATTERN.finditer(attrs):
+            if attr.group(1).lower() != "href":
+                continue
+            link = html.unescape(attr.group(2) or attr.group(3) or attr.group(4) or "")
+            if link.strip() not in ['../', '']:
+                links.append(os.path.join(parent, link))
+    return links
 
 
-def _read_remote_file_content(remote_file_url: str) -> str:
-    try:
-        with requests.get(remote_file_url) as r:
-            if r.status_code == 200:
-                return r.text.strip() if r.text else ""
-    except Exception as e:
-        logger.error("Can not read file %s. The error is %s", remote_file_url, e)
-        return None
+def _urljoin(root_url: str, *paths: str) -> str:
+    """Join paths to the root url, which should not end with "/". Unlike
+       os.path.join, a path starting with "/" will not drop the root url.
+    """
+    return "/".join([root_url] + [p.lstrip("/") for p in paths])
 
 
-def _decide_root_url(bucket: str) -> str:
-    if bucket.strip().startswith("prod-maven"):
-        return "https://maven.repository.redhat.com"
-    if bucket.strip().startswith("stage-maven"):
-        return "https://maven.stage.repository.redhat.com"
+@functools.lru_cache(maxsize=8)
+def _decide_root_url(bucket: str) -> Optional[str]:
+    bucket_name = bucket.strip()
+    for (bucket_prefix, root_url) in _BUCKET_ROOT_URLS:
+        if bucket_name.startswith(bucket_prefix):
+            return root_url
     return None
 
 
@@ -307,8 +450,7 @@ def refresh_checksum(
             temp_f = os.path.join(tempfile.gettempdir(), path)
             folder = os.path.dirname(temp_f)
             try:
-                if not os.path.exists(folder):
-                    os.makedirs(folder)
+                os.makedirs(folder, exist_ok=True)
                 s3_client.download_file(bucket_name, s3_path, temp_f)
                 existed_checksum_types = []
                 for file_type in checksums:
@@ -316,11 +458,14 @@ def refresh_checksum(
                     if s3_client.file_exists_in_bucket(bucket_name, s3_checksum_path):
                         existed_checksum_types.append(file_type)
                 if existed_checksum_types:
+                    # Digest the file only once for all the existed checksum types
+                    correct_checksums = digest_all(
+                        temp_f, [checksums[t] for t in existed_checksum_types]
+                    )
                     for file_type in existed_checksum_types:
                         checksum_path = path + file_type
                         s3_checksum_path = s3_path + file_type
-                        hash_type = checksums[file_type]
-                        correct_checksum_c = digest(temp_f, hash_type)
+                        correct_checksum_c = correct_checksums[checksums[file_type]]
                         original_checksum_c = s3_client.read_file_content(
                             bucket_name, s3_checksum_path
                         )
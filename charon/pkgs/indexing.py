@@ -45,6 +45,11 @@ def __get_index_template(package_type: str) -> str:
 
 MAVEN_INDEX_TEMPLATE = __get_index_template(PACKAGE_TYPE_MAVEN)
 NPM_INDEX_TEMPLATE = __get_index_template(PACKAGE_TYPE_NPM)
+# Templates are compiled only once instead of for every generated index file
+_INDEX_JINJA_TEMPLATES = {
+    PACKAGE_TYPE_MAVEN: Template(MAVEN_INDEX_TEMPLATE),
+    PACKAGE_TYPE_NPM: Template(NPM_INDEX_TEMPLATE)
+}
 
 
 class IndexedHTML(object):
@@ -55,10 +60,7 @@ class IndexedHTML(object):
         self.items = items
 
     def generate_index_file_content(self, package_type: str) -> str:
-        if package_type == PACKAGE_TYPE_MAVEN:
-            template = Template(MAVEN_INDEX_TEMPLATE)
-        elif package_type == PACKAGE_TYPE_NPM:
-            template = Template(NPM_INDEX_TEMPLATE)
+        template = _INDEX_JINJA_TEMPLATES[package_type]
         return template.render(index=self)
 
 
@@ -19,7 +19,7 @@ import charon.pkgs.signature as signature
 from charon.utils.files import overwrite_file, digest, write_manifest
 from charon.utils.archive import extract_zip_all
 from charon.utils.strings import remove_prefix
-from charon.storage import S3Client
+from charon.storage import S3Client, LISTING_CON_LIMIT
 from charon.cache import CFClient
 from charon.pkgs.pkg_utils import (
     upload_post_process,
@@ -31,17 +31,20 @@ from charon.constants import (META_FILE_GEN_KEY, META_FILE_DEL_KEY,
                               META_FILE_FAILED, MAVEN_METADATA_TEMPLATE,
                               ARCHETYPE_CATALOG_TEMPLATE, ARCHETYPE_CATALOG_FILENAME,
                               PACKAGE_TYPE_MAVEN)
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from jinja2 import Template
 from datetime import datetime
 from zipfile import ZipFile, BadZipFile
 from tempfile import mkdtemp
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from defusedxml import ElementTree
 
 import os
 import sys
 import logging
 import re
+import functools
 
 logger = logging.getLogger(__name__)
 
@@ -58,9 +61,16 @@ def __get_mvn_template(kind: str, default: str) -> str:
 
 META_TEMPLATE = __get_mvn_template("maven-metadata.xml.j2", MAVEN_METADATA_TEMPLATE)
 ARCH_TEMPLATE = __get_mvn_template("archetype-catalog.xml.j2", ARCHETYPE_CATALOG_TEMPLATE)
+# Templates are compiled only once instead of for every generated file
+_META_JINJA_TEMPLATE = Template(META_TEMPLATE)
+_ARCH_JINJA_TEMPLATE = Template(ARCHETYPE_CATALOG_TEMPLATE)
 MAVEN_METADATA_FILE = "maven-metadata.xml"
 MAVEN_ARCH_FILE = "archetype-catalog.xml"
 STANDARD_GENERATED_IGNORES = [MAVEN_METADATA_FILE, MAVEN_ARCH_FILE]
+_STANDARD_GENERATED_PREFIXES = tuple(n.strip() for n in STANDARD_GENERATED_IGNORES)
+
+# More listing workers than the limit of the s3 client would only wait for it
+META_LISTING_WORKERS = LISTING_CON_LIMIT
 
 
 class MavenMetadata(object):
@@ -68,36 +78,33 @@ class MavenMetadata(object):
     used in jinja2 or other places
     """
 
-    def __init__(self, group_id: str, artifact_id: str, versions: List[str]):
+    def __init__(
+        self, group_id: str, artifact_id: str, versions: List[str], last_upd_time: str = None
+    ):
         self.group_id = group_id
         self.artifact_id = artifact_id
-        self.last_upd_time = datetime.now().strftime("%Y%m%d%H%M%S")
-        self.versions = sorted(set(versions), key=VersionCompareKey)
-        self._latest_version = None
-        self._release_version = None
+        self.last_upd_time = last_upd_time if last_upd_time else _last_upd_time()
+        self.versions = sorted(set(versions), key=_version_key)
 
     def generate_meta_file_content(self) -> str:
-        template = Template(META_TEMPLATE)
-        return template.render(meta=self)
+        return _META_JINJA_TEMPLATE.render(meta=self)
 
-    @property
+    @functools.cached_property
     def latest_version(self):
-        if self._latest_version:
-            return self._latest_version
-        self._latest_version = self.versions[-1]
-        return self._latest_version
+        return self.versions[-1]
 
-    @property
+    @functools.cached_property
     def release_version(self):
-        if self._release_version:
-            return self._release_version
-        self._release_version = self.versions[-1]
-        return self._release_version
+        return self.versions[-1]
 
     def __str__(self) -> str:
         return f"{self.group_id}:{self.artifact_id}\n{self.versions}\n\n"
 
 
+def _last_upd_time() -> str:
+    return datetime.now().strftime("%Y%m%d%H%M%S")
+
+
 class ArchetypeRef(object):
     """This ArchetypeRef will represent an entry in archetype-catalog.xml content which will be
     used in jinja2 or other places
@@ -133,8 +140,7 @@ class MavenArchetypeCatalog(object):
         self.archetypes = sorted(set(archetypes), key=ArchetypeCompareKey)
 
     def generate_meta_file_content(self) -> str:
-        template = Template(ARCHETYPE_CATALOG_TEMPLATE)
-        return template.render(archetypes=self.archetypes)
+        return _ARCH_JINJA_TEMPLATE.render(archetypes=self.archetypes)
 
     def __str__(self) -> str:
         return f"(Archetype Catalog with {len(self.archetypes)} entries).\n\n"
@@ -143,13 +149,56 @@ class MavenArchetypeCatalog(object):
 def scan_for_poms(full_path: str) -> List[str]:
     """Scan a file path and finds all pom files absolute paths"""
     # collect poms
-    all_pom_paths = list()
-    for (directory, _, names) in os.walk(full_path):
-        single_pom_paths = [
-            os.path.join(directory, n) for n in names if n.endswith(".pom")
-        ]
-        all_pom_paths.extend(single_pom_paths)
-    return all_pom_paths
+    return list(chain.from_iterable(
+        (f.path for f in files if f.name.endswith(".pom"))
+        for _, _, files in _walk_dirs(full_path)
+    ))
+
+
+def _walk_dirs(top: str):
+    """Walk the dir tree in the same order as os.walk, and yield each dir
+       path with the entries of its sub dirs and files. Like os.walk, the
+       sub dirs list can be changed in place to skip walking into them,
+       and symlinked dirs are not walked into.
+    """
+    folders = [top]
+    while folders:
+        dir_path = folders.pop()
+        dirs, files = _scan_dir(dir_path)
+        yield (dir_path, dirs, files)
+        folders.extend(d.path for d in reversed(dirs) if not d.is_symlink())
+
+
+def _find_top_level(files_root: str, root: str) -> Optional[str]:
+    """Find the top level dir of the maven repository in the tarball, which
+       is the first dir named as root, or the root path under files_root.
+       Returns None if there is no such dir.
+    """
+    root_path = os.path.join(files_root, root)
+    for _, dirs, _ in _walk_dirs(files_root):
+        for d in dirs:
+            if d.name == root or d.path == root_path:
+                return d.path
+    return None
+
+
+def _scan_dir(directory: str) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+    """List the sub dirs and files of the directory. os.scandir gets the
+       types of the entries from the directory listing, so no extra stat
+       is needed for them. Like os.walk, unreadable directories are
+       treated as empty ones.
+    """
+    dirs, files = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    dirs.append(entry)
+                else:
+                    files.append(entry)
+    except OSError:
+        pass
+    return (dirs, files)
 
 
 def parse_ga(full_ga_path: str, root="/") -> Tuple[str, str]:
@@ -168,9 +217,8 @@ def parse_ga(full_ga_path: str, root="/") -> Tuple[str, str]:
     if ga_path.endswith("/"):
         ga_path = ga_path[:-1]
 
-    items = ga_path.split("/")
-    artifact = items[len(items) - 1]
-    group = ".".join(items[:-1])
+    (group_path, _, artifact) = ga_path.rpartition("/")
+    group = group_path.replace("/", ".")
 
     return group, artifact
 
@@ -191,10 +239,11 @@ def __parse_gav(full_artifact_path: str, root="/") -> Tuple[str, str, str]:
     if ver_path.endswith("/"):
         ver_path = ver_path[:-1]
 
-    items = ver_path.split("/")
+    # Only the last 3 items are needed, so no need to split the group path
+    items = ver_path.rsplit("/", 3)
     version = items[-2]
     artifact = items[-3]
-    group = ".".join(items[:-3])
+    group = items[0].replace("/", ".") if len(items) > 3 else ""
 
     return group, artifact, version
 
@@ -207,19 +256,17 @@ def parse_gavs(pom_paths: List[str], root="/") -> Dict[str, Dict[str, List[str]]
     gavs = dict()
     for pom in pom_paths:
         (g, a, v) = __parse_gav(pom, root)
-        avs = gavs.get(g, dict())
-        vers = avs.get(a, list())
-        vers.append(v)
-        avs[a] = vers
-        gavs[g] = avs
+        gavs.setdefault(g, {}).setdefault(a, []).append(v)
     return gavs
 
 
-def gen_meta_file(group_id, artifact_id: str, versions: list, root="/", digest=True) -> List[str]:
+def gen_meta_file(
+    group_id, artifact_id: str, versions: list, root="/", digest=True, last_upd_time=None
+) -> List[str]:
     content = MavenMetadata(
-        group_id, artifact_id, versions
+        group_id, artifact_id, versions, last_upd_time
     ).generate_meta_file_content()
-    g_path = "/".join(group_id.split("."))
+    g_path = group_id.replace(".", "/")
     meta_files = []
     final_meta_path = os.path.join(root, g_path, artifact_id, MAVEN_METADATA_FILE)
     try:
@@ -320,16 +367,36 @@ def handle_maven_uploading(
         "Start uploading files to s3 buckets: %s",
         [bucket[1] for bucket in buckets]
     )
-    failed_files = s3_client.upload_files(
-        file_paths=valid_mvn_paths,
-        targets=targets_,
-        product=prod_key,
-        root=top_level
-    )
+    # The existed poms of the GAs are listed for the metadata generation
+    # during the uploading, instead of waiting for it to finish
+    valid_gavs = parse_gavs(valid_poms, top_level)
+    with ThreadPoolExecutor(max_workers=len(targets_)) as executor:
+        listing_futures = [
+            executor.submit(
+                _list_ga_poms, s3_client, bucket_name, valid_poms, top_level, prefix,
+                gavs=valid_gavs
+            )
+            for (bucket_name, prefix) in targets_
+        ]
+        failed_files = s3_client.upload_files(
+            file_paths=valid_mvn_paths,
+            targets=targets_,
+            product=prod_key,
+            root=top_level
+        )
+        bucket_ga_listings = [future.result() for future in listing_futures]
     logger.info("Files uploading done\n")
+    uploaded_poms, failed_poms = [], []
+    if not dry_run:
+        failed_set = set(failed_files)
+        for pom in valid_poms:
+            if pom in failed_set:
+                failed_poms.append(pom)
+            else:
+                uploaded_poms.append(pom)
     succeeded = True
     generated_signs = []
-    for bucket in buckets:
+    for bucket, ga_listings in zip(buckets, bucket_ga_listings):
         # prepare cf invalidate files
         cf_invalidate_paths = []
 
@@ -352,10 +419,20 @@ def handle_maven_uploading(
         bucket_name = bucket[1]
         prefix = remove_prefix(bucket[2], "/")
         logger.info("Start generating maven-metadata.xml files for bucket %s", bucket_name)
+        ga_listings = _add_uploaded_poms(ga_listings, uploaded_poms, top_level)
+        if len(failed_poms) > 0:
+            # The failures are not reported per bucket, so a failed pom may
+            # still be uploaded to this bucket. List its GA again after the
+            # uploading to get what is really in the bucket.
+            ga_listings = _replace_ga_listings(
+                ga_listings,
+                _list_ga_poms(s3_client, bucket_name, failed_poms, top_level, prefix)
+            )
         meta_files = _generate_metadatas(
             s3=s3_client, bucket=bucket_name,
             poms=valid_poms, root=top_level,
-            prefix=prefix
+            prefix=prefix,
+            ga_listings=ga_listings
         )
         logger.info("maven-metadata.xml files generation done\n")
         failed_metas = meta_files.get(META_FILE_FAILED, [])
@@ -513,12 +590,15 @@ def handle_maven_del(
     # 3. Delete all valid_paths from s3
     logger.debug("Valid poms: %s", valid_poms)
     succeeded = True
+    # One client for all buckets, so they share its http connection pool
+    s3_client = S3Client(aws_profile=aws_profile, dry_run=dry_run)
+    # The GAVs are the same for all buckets, so only parse them once
+    valid_gavs = parse_gavs(valid_poms, top_level)
     for bucket in buckets:
         # prepare cf invalidation paths
         cf_invalidate_paths = []
 
         prefix = remove_prefix(bucket[2], "/")
-        s3_client = S3Client(aws_profile=aws_profile, dry_run=dry_run)
         bucket_name = bucket[1]
         logger.info("Start deleting files from s3 bucket %s", bucket_name)
         failed_files = s3_client.delete_files(
@@ -546,7 +626,7 @@ def handle_maven_del(
         meta_files = _generate_metadatas(
             s3=s3_client, bucket=bucket_name,
             poms=valid_poms, root=top_level,
-            prefix=prefix
+            prefix=prefix, gavs=valid_gavs
         )
 
         logger.info("maven-metadata.xml files generation done\n")
@@ -671,53 +751,52 @@ def _scan_paths(files_root: str, ignore_patterns: List[str],
     # 2. scan for paths and filter out the ignored paths,
     # and also collect poms for later metadata generation
     logger.info("Scan %s to collect files", files_root)
-    top_level = root
     valid_mvn_paths, non_mvn_paths, ignored_paths, valid_poms, valid_dirs = [], [], [], [], []
-    changed_dirs = set()
-    top_found = False
-    for root_dir, dirs, names in os.walk(files_root):
-        for directory in dirs:
-            changed_dirs.add(os.path.join(root_dir, directory))
-            if not top_found:
-                if directory == top_level:
-                    top_level = os.path.join(root_dir, directory)
-                    top_found = True
-                if os.path.join(root_dir, directory) == os.path.join(files_root, top_level):
-                    top_level = os.path.join(files_root, top_level)
-                    top_found = True
-
-        for name in names:
-            path = os.path.join(root_dir, name)
-            if top_level in root_dir:
-                # Let's wait to do the regex / pom examination until we
-                # know we're inside a valid root directory.
-                if _is_ignored(name, ignore_patterns):
-                    ignored_paths.append(path)
-                    continue
-
-                valid_mvn_paths.append(path)
-
-                if name.strip().endswith(".pom"):
-                    valid_poms.append(path)
+    ignore_regexes = _compile_ignore_patterns(ignore_patterns)
+    top_level = _find_top_level(files_root, root)
+    top_found = top_level is not None
+
+    def collect_mvn_files(files: List[os.DirEntry]):
+        for f in files:
+            if _is_ignored(f.name, ignore_regexes):
+                ignored_paths.append(f.path)
+                continue
+
+            valid_mvn_paths.append(f.path)
+
+            if f.name.strip().endswith(".pom"):
+                valid_poms.append(f.path)
+
+    if top_found:
+        # All files under the top level dir are maven files, and the others
+        # are only walked for reporting
+        valid_dirs.append(top_level)
+        for _, dirs, files in _walk_dirs(top_level):
+            valid_dirs.extend(d.path for d in dirs)
+            collect_mvn_files(files)
+        if logger.isEnabledFor(logging.INFO):
+            for _, dirs, files in _walk_dirs(files_root):
+                dirs[:] = [d for d in dirs if d.path != top_level]
+                non_mvn_paths.extend(f.path for f in files)
+    else:
+        for root_dir, _, files in _walk_dirs(files_root):
+            if root in root_dir:
+                collect_mvn_files(files)
             else:
-                non_mvn_paths.append(path)
+                non_mvn_paths.extend(f.path for f in files)
 
     if len(non_mvn_paths) > 0:
         non_mvn_items = [n.replace(files_root, "") for n in non_mvn_paths]
         logger.info("These files are not in the specified "
                     "root dir %s, so will be ignored: \n%s",
                     root, non_mvn_items)
-    if not top_found or top_level.strip() == "" or top_level.strip() == "/":
+    if not top_found:
         logger.warning(
             "Warning: the root path %s does not exist in tarball,"
             " will use empty trailing prefix for the uploading",
-            top_level
+            root
         )
         top_level = files_root
-    else:
-        for c in changed_dirs:
-            if c.startswith(top_level):
-                valid_dirs.append(c)
     logger.info("Files scanning done.\n")
 
     if ignore_patterns and len(ignore_patterns) > 0:
@@ -985,30 +1064,31 @@ def _parse_archetypes(source) -> List[ArchetypeRef]:
     return archetypes
 
 
-def _generate_metadatas(
+def _list_ga_poms(
     s3: S3Client, bucket: str,
     poms: List[str], root: str,
-    prefix: str = None
-) -> Dict[str, List[str]]:
-    """Collect GAVs and generating maven-metadata.xml.
-       As all valid poms has been stored in s3 bucket,
-       what we should do here is:
-       * Scan and get the GA for the poms
-       * Search all poms in s3 based on the GA
-       * Use searched poms and scanned poms to generate
-         maven-metadata to refresh
+    prefix: str = None,
+    gavs: Dict[str, Dict[str, List[str]]] = None
+) -> List[Tuple[str, List[str], bool]]:
+    """List the poms in s3 bucket for all GAs of the poms. Returns each GA path
+       with its poms in s3 (without the prefix) and if the listing succeeded,
+       in the order of the GAs. The gavs can be given if the poms have been
+       parsed by parse_gavs already.
     """
-    ga_dict: Dict[str, bool] = {}
+    # The GAs from parse_gavs are unique already, so the GA paths
+    # don't need to be deduplicated
+    ga_paths: List[str] = []
     logger.debug("Valid poms: %s", poms)
-    valid_gavs_dict = parse_gavs(poms, root)
+    valid_gavs_dict = gavs if gavs is not None else parse_gavs(poms, root)
     for g, avs in valid_gavs_dict.items():
+        g_path = g.replace(".", "/")
         for a in avs.keys():
             logger.debug("G: %s, A: %s", g, a)
-            g_path = "/".join(g.split("."))
-            ga_dict[os.path.join(g_path, a)] = True
-    all_poms = []
-    meta_files = {}
-    for path, _ in ga_dict.items():
+            ga_paths.append(os.path.join(g_path, a))
+    if not ga_paths:
+        return []
+    ga_prefixes = []
+    for path in ga_paths:
         # avoid some wrong prefix, like searching org/apache
         # but got org/apache-commons
         ga_prefix = path
@@ -1016,7 +1096,82 @@ def _generate_metadatas(
             ga_prefix = os.path.join(prefix, path)
         if not path.endswith("/"):
             ga_prefix = ga_prefix + "/"
-        (existed_poms, success) = s3.get_files(bucket, ga_prefix, ".pom")
+        ga_prefixes.append(ga_prefix)
+    # Each listing is a round trip to s3, so list the GAs concurrently,
+    # the results are still handled in the order of the GAs
+    with ThreadPoolExecutor(max_workers=META_LISTING_WORKERS) as executor:
+        listings = executor.map(
+            lambda ga_prefix: s3.get_files(bucket, ga_prefix, ".pom"), ga_prefixes
+        )
+        ga_listings = list(zip(ga_paths, listings))
+    results = []
+    for path, (existed_poms, success) in ga_listings:
+        un_prefixed_poms = existed_poms
+        if prefix:
+            if not prefix.endswith("/"):
+                un_prefixed_poms = [remove_prefix(pom, prefix) for pom in existed_poms]
+            else:
+                un_prefixed_poms = [remove_prefix(pom, prefix + "/") for pom in existed_poms]
+        results.append((path, un_prefixed_poms, success))
+    return results
+
+
+def _add_uploaded_poms(
+    ga_listings: List[Tuple[str, List[str], bool]],
+    uploaded_poms: List[str], root: str
+) -> List[Tuple[str, List[str], bool]]:
+    """Add the uploaded poms to the GA listings which were made during the
+       uploading. The failed listings are kept as they are.
+    """
+    ga_uploaded_poms: Dict[str, List[str]] = {}
+    for pom in uploaded_poms:
+        (g, a, v) = __parse_gav(pom, root)
+        ga_path = os.path.join(g.replace(".", "/"), a)
+        ga_uploaded_poms.setdefault(ga_path, []).append(
+            "/".join([ga_path, v, os.path.basename(pom)])
+        )
+    return [
+        (path, existed_poms + ga_uploaded_poms.get(path, []) if success else existed_poms,
+         success)
+        for path, existed_poms, success in ga_listings
+    ]
+
+
+def _replace_ga_listings(
+    ga_listings: List[Tuple[str, List[str], bool]],
+    new_listings: List[Tuple[str, List[str], bool]]
+) -> List[Tuple[str, List[str], bool]]:
+    """Replace the GA listings with the new listings of the same GAs"""
+    new_dict = {path: (poms, success) for path, poms, success in new_listings}
+    return [
+        (path, *new_dict[path]) if path in new_dict else (path, existed_poms, success)
+        for path, existed_poms, success in ga_listings
+    ]
+
+
+def _generate_metadatas(
+    s3: S3Client, bucket: str,
+    poms: List[str], root: str,
+    prefix: str = None,
+    ga_listings: List[Tuple[str, List[str], bool]] = None,
+    gavs: Dict[str, Dict[str, List[str]]] = None
+) -> Dict[str, List[str]]:
+    """Collect GAVs and generating maven-metadata.xml.
+       As all valid poms has been stored in s3 bucket,
+       what we should do here is:
+       * Scan and get the GA for the poms
+       * Search all poms in s3 based on the GA
+       * Use searched poms and scanned poms to generate
+         maven-metadata to refresh
+       The ga_listings can be given if the search has been done
+       by _list_ga_poms already, and the gavs if the poms have been
+       parsed by parse_gavs.
+    """
+    if ga_listings is None:
+        ga_listings = _list_ga_poms(s3, bucket, poms, root, prefix, gavs=gavs)
+    all_poms = []
+    meta_files = {}
+    for path, existed_poms, success in ga_listings:
         if len(existed_poms) == 0:
             if success:
                 logger.debug(
@@ -1035,22 +1190,18 @@ def _generate_metadatas(
                 meta_files[META_FILE_FAILED] = meta_failed_path
         else:
             logger.debug(
-                "Got poms in s3 bucket %s for GA path %s: %s", bucket, path, poms
+                "Got poms in s3 bucket %s for GA path %s: %s", bucket, path, existed_poms
             )
-            un_prefixed_poms = existed_poms
-            if prefix:
-                if not prefix.endswith("/"):
-                    un_prefixed_poms = [remove_prefix(pom, prefix) for pom in existed_poms]
-                else:
-                    un_prefixed_poms = [remove_prefix(pom, prefix + "/") for pom in existed_poms]
-            all_poms.extend(un_prefixed_poms)
+            all_poms.extend(existed_poms)
     gav_dict = parse_gavs(all_poms)
     if len(gav_dict) > 0:
         meta_files_generation = []
+        # All metadata files refreshed in one batch share the same lastUpdated
+        last_upd_time = _last_upd_time()
         for g, avs in gav_dict.items():
             for a, vers in avs.items():
                 try:
-                    metas = gen_meta_file(g, a, vers, root)
+                    metas = gen_meta_file(g, a, vers, root, last_upd_time=last_upd_time)
                 except FileNotFoundError:
                     logger.warning("Failed to create or update metadata file for GA"
                                    " %s, please check if aligned Maven GA"
@@ -1067,16 +1218,23 @@ def __hash_decorate_metadata(path: str, metadata: str) -> List[str]:
     ]
 
 
-def _is_ignored(filename: str, ignore_patterns: List[str]) -> bool:
-    for ignored_name in STANDARD_GENERATED_IGNORES:
-        if filename and filename.startswith(ignored_name.strip()):
-            logger.info("Ignoring standard generated Maven path: %s", filename)
-            return True
+def _compile_ignore_patterns(ignore_patterns: List[str]) -> List[re.Pattern]:
+    """Compile the ignore patterns once, so they are not looked up from the
+       re cache again for each scanned file
+    """
+    if not ignore_patterns:
+        return []
+    return [re.compile(p) for p in ignore_patterns]
+
+
+def _is_ignored(filename: str, ignore_regexes: List[re.Pattern]) -> bool:
+    if filename and filename.startswith(_STANDARD_GENERATED_PREFIXES):
+        logger.info("Ignoring standard generated Maven path: %s", filename)
+        return True
 
-    if ignore_patterns:
-        for dirs in ignore_patterns:
-            if re.match(dirs, filename):
-                return True
+    for regex in ignore_regexes:
+        if regex.match(filename):
+            return True
     return False
 
 
@@ -1112,6 +1270,20 @@ def __wildcard_metadata_paths(paths: List[str]) -> List[str]:
     return new_paths
 
 
+@functools.lru_cache(maxsize=16384)
+def _version_key(version: str) -> Tuple:
+    """Builds a tuple key for version sorting, so the version is only parsed
+       once instead of in each comparison. The items are split by "." and
+       the last one also by "-", and numeric items sort after non-numeric
+       ones, which keeps the same order as VersionCompareKey. The keys are
+       cached as the same versions are shared by lots of GAs in one release.
+    """
+    items = version.split(".")
+    if "-" in items[-1]:
+        items = items[:-1] + items[-1].split("-")
+    return tuple((1, int(i)) if i.isnumeric() else (0, i) for i in items)
+
+
 class VersionCompareKey:
     'Used as key function for version sorting'
     def __init__(self, obj):
@@ -1136,36 +1308,9 @@ class VersionCompareKey:
         return self.obj.__hash__()
 
     def __compare(self, other) -> int:
-        xitems = self.obj.split(".")
-        if "-" in xitems[-1]:
-            xitems = xitems[:-1] + xitems[-1].split("-")
-        yitems = other.obj.split(".")
-        if "-" in yitems[-1]:
-            yitems = yitems[:-1] + yitems[-1].split("-")
-        big = max(len(xitems), len(yitems))
-        for i in range(big):
-            try:
-                xitem = xitems[i]
-            except IndexError:
-                return -1
-            try:
-                yitem = yitems[i]
-            except IndexError:
-                return 1
-            if xitem.isnumeric() and yitem.isnumeric():
-                xitem = int(xitem)
-                yitem = int(yitem)
-            elif xitem.isnumeric() and not yitem.isnumeric():
-                return 1
-            elif not xitem.isnumeric() and yitem.isnumeric():
-                return -1
-            if xitem > yitem:
-                return 1
-            elif xitem < yitem:
-                return -1
-            else:
-                continue
-        return 0
+        x = _version_key(self.obj)
+        y = _version_key(other.obj)
+        return (x > y) - (x < y)
 
 
 class ArchetypeCompareKey(VersionCompareKey):
@@ -54,7 +54,7 @@ def __post_process(
         logger.error(
             "%d file(s) occur errors/warnings in bucket %s, "
             "please see errors.log for details.\n",
-            bucket, total
+            total, bucket
         )
         logger.error(
             "Product release %s is %s Ronda service in bucket %s, "
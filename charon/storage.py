@@ -30,7 +30,17 @@ import mimetypes
 import functools
 from concurrent.futures import ThreadPoolExecutor
 
-_executor = ThreadPoolExecutor(10)
+# The concurrent S3 requests of a client are limited by its semaphore. The
+# thread pool and the http connection pool need to be as big as that limit,
+# otherwise they will become the real limit of the concurrency
+DEFAULT_CON_LIMIT = 32
+
+# The file listings are sync calls which can be run concurrently with the
+# uploading from other threads, so they have their own limit and their own
+# share of the http connection pool
+LISTING_CON_LIMIT = 16
+
+_executor = ThreadPoolExecutor(DEFAULT_CON_LIMIT)
 
 logger = logging.getLogger(__name__)
 
@@ -53,16 +63,17 @@ class S3Client(object):
     def __init__(
         self,
         aws_profile=None, extra_conf=None,
-        con_limit=25, dry_run=False
+        con_limit=DEFAULT_CON_LIMIT, dry_run=False
     ) -> None:
-        self.__client = self.__init_aws_client(aws_profile, extra_conf)
+        self.__client = self.__init_aws_client(aws_profile, extra_conf, con_limit)
         self.__buckets: Dict[str, Any] = {}
         self.__dry_run = dry_run
         self.__con_sem = asyncio.BoundedSemaphore(con_limit)
         self.__lock = threading.Lock()
+        self.__listing_sem = threading.BoundedSemaphore(LISTING_CON_LIMIT)
 
     def __init_aws_client(
-        self, aws_profile=None, extra_conf=None
+        self, aws_profile=None, extra_conf=None, con_limit=DEFAULT_CON_LIMIT
     ):
         if aws_profile:
             logger.debug("[S3] Using aws profile: %s", aws_profile)
@@ -70,11 +81,11 @@ class S3Client(object):
         else:
             s3_session = session.Session()
         endpoint_url = self.__get_endpoint(extra_conf)
-        config = None
+        config = Config(max_pool_connections=con_limit + LISTING_CON_LIMIT)
         if self.__enable_acceleration(extra_conf):
             logger.info("[S3] S3 acceleration config enabled, "
                         "will enable s3 use_accelerate_endpoint config")
-            config = Config(s3={"use_accelerate_endpoint": True})
+            config = config.merge(Config(s3={"use_accelerate_endpoint": True}))
         return s3_session.resource(
             's3',
             endpoint_url=endpoint_url,
@@ -761,16 +772,17 @@ class S3Client(object):
         """
         bucket = self.__get_bucket(bucket_name)
         objs = []
-        if prefix and prefix.strip() != "":
-            try:
-                objs = list(bucket.objects.filter(Prefix=prefix))
-            except (ClientError, HTTPClientError) as e:
-                logger.error("[S3] ERROR: Can not get files under %s in bucket"
-                             " %s due to error: %s ", prefix,
-                             bucket_name, e)
-                return ([], False)
-        else:
-            objs = list(bucket.objects.all())
+        with self.__listing_sem:
+            if prefix and prefix.strip() != "":
+                try:
+                    objs = list(bucket.objects.filter(Prefix=prefix))
+                except (ClientError, HTTPClientError) as e:
+                    logger.error("[S3] ERROR: Can not get files under %s in bucket"
+                                 " %s due to error: %s ", prefix,
+                                 bucket_name, e)
+                    return ([], False)
+            else:
+                objs = list(bucket.objects.all())
         files = []
         if suffix and suffix.strip() != "":
             files = [i.key for i in objs if i.key.endswith(suffix)]
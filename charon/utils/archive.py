@@ -19,21 +19,92 @@ import sys
 import tarfile
 import requests
 import tempfile
+import threading
 import shutil
 import subresource_integrity
 from enum import Enum
 from json import load, JSONDecodeError, dump
-from typing import Tuple
-from zipfile import ZipFile, is_zipfile
+from typing import List, Tuple
+from zipfile import ZipFile, ZipInfo, is_zipfile
+from concurrent.futures import ThreadPoolExecutor
 from charon.constants import DEFAULT_REGISTRY
 from charon.utils.files import digest, HashType
 from charon.utils.map import del_none
 
 logger = logging.getLogger(__name__)
 
+EXTRACT_BUFFER_SIZE = 1024 * 1024
+
 
 def extract_zip_all(zf: ZipFile, target_dir: str):
-    zf.extractall(target_dir)
+    """Extract all the entries of the zip file into the target dir. The
+       entries are extracted concurrently, as they are written to different
+       files and the decompression does not hold the GIL. Each worker reads
+       with its own ZipFile of the same zip, the given one is only used for
+       its entry list.
+    """
+    dirs, files = set(), {}
+    for info in zf.infolist():
+        target_path = _zip_member_path(info, target_dir)
+        if info.is_dir():
+            dirs.add(target_path)
+        else:
+            dirs.add(os.path.dirname(target_path))
+            # Like extractall, the last one wins if the names are the same
+            files[target_path] = info
+    # Create all the dirs first, so the workers will not race on them
+    for d in sorted(dirs):
+        os.makedirs(d, exist_ok=True)
+    if not zf.filename:
+        # A zip from a file object can not be opened again for the workers
+        for target_path, info in files.items():
+            _extract_zip_file(zf, info, target_path)
+        return
+    # ZipFile does not guard the shared state of its underlying file, so the
+    # workers must not open the entries from one ZipFile at the same time
+    local = threading.local()
+    worker_zfs: List[ZipFile] = []
+    lock = threading.Lock()
+
+    def extract(item: Tuple[str, ZipInfo]):
+        worker_zf = getattr(local, "zf", None)
+        if worker_zf is None:
+            worker_zf = ZipFile(zf.filename)
+            local.zf = worker_zf
+            with lock:
+                worker_zfs.append(worker_zf)
+        _extract_zip_file(worker_zf, item[1], item[0])
+
+    try:
+        with ThreadPoolExecutor() as executor:
+            list(executor.map(extract, files.items()))
+    finally:
+        for worker_zf in worker_zfs:
+            worker_zf.close()
+
+
+def _zip_member_path(info: ZipInfo, target_dir: str) -> str:
+    """Get the extracting path of the zip entry in the same way as
+       ZipFile.extract, which removes the drive, "." and ".." parts of the
+       name to keep the path inside the target dir
+    """
+    arcname = info.filename.replace("/", os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    invalid_path_parts = ("", os.path.curdir, os.path.pardir)
+    arcname = os.path.sep.join(
+        x for x in arcname.split(os.path.sep) if x not in invalid_path_parts
+    )
+    return os.path.normpath(os.path.join(target_dir, arcname))
+
+
+def _extract_zip_file(zf: ZipFile, info: ZipInfo, target_path: str):
+    # Copy with big chunks and a big write buffer, as the default 64KB
+    # chunks and 8KB buffer make too many small writes for big artifacts
+    with zf.open(info) as source, \
+         open(target_path, "wb", buffering=EXTRACT_BUFFER_SIZE) as target:
+        shutil.copyfileobj(source, target, length=EXTRACT_BUFFER_SIZE)
 
 
 def extract_zip_with_files(zf: ZipFile, target_dir: str, file_suffix: str, debug=False):
@@ -17,7 +17,7 @@ from enum import Enum
 import os
 import hashlib
 import errno
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 from charon.constants import MANIFEST_SUFFIX
 
 
@@ -73,11 +73,15 @@ def read_sha1(file: str) -> str:
 
 
 def digest(file: str, hash_type=HashType.SHA1) -> str:
-    hash_obj = _hash_object(hash_type)
-
-    # BUF_SIZE is totally arbitrary, change for your app!
-    BUF_SIZE = 65536  # lets read stuff in 64kb chunks!
     with open(file, "rb") as f:
+        # file_digest(python 3.11+) reads and hashes the whole file in C
+        # without going back to the python loop for each chunk
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, lambda: _hash_object(hash_type)).hexdigest()
+
+        hash_obj = _hash_object(hash_type)
+        # BUF_SIZE is totally arbitrary, change for your app!
+        BUF_SIZE = 65536  # lets read stuff in 64kb chunks!
         while True:
             data = f.read(BUF_SIZE)
             if not data:
@@ -87,6 +91,22 @@ def digest(file: str, hash_type=HashType.SHA1) -> str:
     return hash_obj.hexdigest()
 
 
+def digest_all(file: str, hash_types: List[HashType]) -> Dict[HashType, str]:
+    """This function will caculate the hash values of the file for all the specified
+       hash types, but only read the file once
+    """
+    hash_objs = {hash_type: _hash_object(hash_type) for hash_type in hash_types}
+    BUF_SIZE = 1024 * 1024
+    with open(file, "rb") as f:
+        while True:
+            data = f.read(BUF_SIZE)
+            if not data:
+                break
+            for hash_obj in hash_objs.values():
+                hash_obj.update(data)
+    return {hash_type: hash_obj.hexdigest() for hash_type, hash_obj in hash_objs.items()}
+
+
 def digest_content(content: str, hash_type=HashType.SHA1) -> str:
     """This function will caculate the hash value for the string content with the specified
        hash type
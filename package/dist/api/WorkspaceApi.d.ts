@@ -0,0 +1,6 @@
+import { ResourceContent, ResourceContentRequest, ResourceListRequest, ResourcesList } from "@redhat/kogito-tooling-channel-common-api";
+export interface WorkspaceApi {
+    receive_openFile(path: string): void;
+    receive_resourceContentRequest(request: ResourceContentRequest): Promise<ResourceContent | undefined>;
+    receive_resourceListRequest(request: ResourceListRequest): Promise<ResourcesList>;
+}
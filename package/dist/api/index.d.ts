@@ -0,0 +1 @@
+export { WorkspaceApi } from "./WorkspaceApi";
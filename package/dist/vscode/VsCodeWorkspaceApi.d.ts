@@ -0,0 +1,7 @@
+import { ResourceContent, ResourceContentRequest, ResourceListRequest, ResourcesList } from "@redhat/kogito-tooling-channel-common-api";
+import { WorkspaceApi } from "../api";
+export declare class VsCodeWorkspaceApi implements WorkspaceApi {
+    receive_openFile(path: string): void;
+    receive_resourceContentRequest(request: ResourceContentRequest): Promise<ResourceContent>;
+    receive_resourceListRequest(request: ResourceListRequest): Promise<ResourcesList>;
+}
@@ -0,0 +1 @@
+export { VsCodeWorkspaceApi } from "./VsCodeWorkspaceApi";
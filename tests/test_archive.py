@@ -1,5 +1,7 @@
 from tests.base import BaseTest
-from charon.utils.archive import NpmArchiveType, detect_npm_archive
+from charon.utils.archive import NpmArchiveType, detect_npm_archive, extract_zip_all
+from zipfile import ZipFile
+import io
 import os
 
 from tests.constants import INPUTS
@@ -12,5 +14,40 @@ class ArchiveTest(BaseTest):
         npm_tarball = os.path.join(INPUTS, "code-frame-7.14.5.tgz")
         self.assertEqual(NpmArchiveType.TAR_FILE, detect_npm_archive(npm_tarball))
 
+    def test_extract_zip_all(self):
+        zip_path = os.path.join(self.tempdir, "test.zip")
+        with ZipFile(zip_path, "w") as zf:
+            zf.writestr("maven-repository/", "")
+            zf.writestr("maven-repository/org/foo/bar/1.0/bar-1.0.pom", "pom")
+            zf.writestr("maven-repository/org/foo/bar/1.0/bar-1.0.jar", "jar")
+            zf.writestr("../outside.txt", "outside")
+        target = os.path.join(self.tempdir, "extracted")
+        os.mkdir(target)
+
+        with ZipFile(zip_path) as zf:
+            extract_zip_all(zf, target)
+
+        ver_dir = os.path.join(target, "maven-repository", "org", "foo", "bar", "1.0")
+        self.assertEqual(["bar-1.0.jar", "bar-1.0.pom"], sorted(os.listdir(ver_dir)))
+        with open(os.path.join(ver_dir, "bar-1.0.pom"), encoding="utf-8") as f:
+            self.assertEqual("pom", f.read())
+        # entries are kept inside the target dir like ZipFile.extractall
+        self.assertTrue(os.path.isfile(os.path.join(target, "outside.txt")))
+        self.assertFalse(os.path.exists(os.path.join(self.tempdir, "outside.txt")))
+
+    def test_extract_zip_all_from_file_object(self):
+        buffer = io.BytesIO()
+        with ZipFile(buffer, "w") as zf:
+            zf.writestr("org/foo/bar/1.0/bar-1.0.pom", "pom")
+            zf.writestr("org/foo/bar/1.0/bar-1.0.jar", "jar")
+        target = os.path.join(self.tempdir, "extracted")
+        os.mkdir(target)
+
+        with ZipFile(buffer) as zf:
+            extract_zip_all(zf, target)
+
+        ver_dir = os.path.join(target, "org", "foo", "bar", "1.0")
+        self.assertEqual(["bar-1.0.jar", "bar-1.0.pom"], sorted(os.listdir(ver_dir)))
+
     def test_download_archive(self):
         pass
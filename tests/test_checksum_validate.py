@@ -0,0 +1,347 @@
+"""
+Copyright (C) 2022 Red Hat, Inc. (https://github.com/Commonjava/charon)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+         http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from charon.pkgs.checksum_http import (
+    handle_checksum_validation_http, _parse_index_links, _gen_report
+)
+from charon.utils.files import digest_content
+from tests.base import BaseTest
+from flexmock import flexmock
+from typing import List
+import charon.pkgs.checksum_http as checksum_http
+import csv
+import os
+import sys
+import requests
+import responses
+from responses import matchers
+
+ROOT_URL = "https://maven.repository.redhat.com"
+TEST_BUCKET = "prod-maven-ga"
+GA_PATH = "ga/org/foo/bar"
+
+
+class ChecksumValidationTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.report_dir = os.path.join(self.tempdir, "report")
+        os.mkdir(self.report_dir)
+
+    @responses.activate
+    def test_validation_report(self):
+        ver_path = GA_PATH + "/1.0"
+        self.__mock_folder(ver_path, [
+            "bar-1.0.jar", "bar-1.0.jar.sha1",
+            "bar-1.0.pom", "bar-1.0.pom.sha1",
+            "bar-1.0-sources.jar", "bar-1.0.txt"
+        ])
+        self.__mock_file(ver_path + "/bar-1.0.jar", "jar content")
+        self.__mock_file(ver_path + "/bar-1.0.pom", "pom content", sha1="wrong")
+        self.__mock_file(ver_path + "/bar-1.0-sources.jar", "sources", sha1=None)
+
+        handle_checksum_validation_http(
+            TEST_BUCKET, ver_path, None, self.report_dir
+        )
+
+        self.assertEqual(
+            [ver_path + "/bar-1.0.pom"],
+            self.__read_report("mismatched_files.csv")
+        )
+        self.assertEqual(
+            [ver_path + "/bar-1.0-sources.jar"],
+            self.__read_report("missing_checksum_files.csv")
+        )
+        self.assertFalse(
+            os.path.exists(os.path.join(self.report_dir, "error_files.csv"))
+        )
+        # checksum files are only fetched once with GET, no extra HEAD
+        methods = [c.request.method for c in responses.calls]
+        self.assertNotIn("HEAD", methods)
+        sha1_calls = [c for c in responses.calls if c.request.url.endswith(".sha1")]
+        self.assertEqual(3, len(sha1_calls))
+        # missing checksum files will not download the artifact
+        self.assertNotIn(
+            f"{ROOT_URL}/{ver_path}/bar-1.0-sources.jar",
+            [c.request.url for c in responses.calls]
+        )
+
+    @responses.activate
+    def test_validation_includes(self):
+        ver_path = GA_PATH + "/1.0"
+        self.__mock_folder(ver_path, [
+            "bar-1.0.jar", "bar-1.0.jar.sha1",
+            "bar-1.0.pom", "bar-1.0.pom.sha1"
+        ])
+        self.__mock_file(ver_path + "/bar-1.0.jar", "jar content", sha1="wrong")
+        self.__mock_file(ver_path + "/bar-1.0.pom", "pom content", sha1="wrong")
+
+        handle_checksum_validation_http(
+            TEST_BUCKET, ver_path, ".pom", self.report_dir
+        )
+
+        self.assertEqual(
+            [ver_path + "/bar-1.0.pom"],
+            self.__read_report("mismatched_files.csv")
+        )
+
+    @responses.activate
+    def test_recursive_validation_with_skips(self):
+        self.__mock_folder(GA_PATH, ["1.0/", "1.1/", "maven-metadata.xml"])
+        self.__mock_file(GA_PATH + "/maven-metadata.xml", "metadata")
+        for ver in ["1.0", "1.1"]:
+            ver_path = GA_PATH + "/" + ver
+            jar = f"bar-{ver}.jar"
+            self.__mock_folder(ver_path, [jar, jar + ".sha1"])
+            self.__mock_file(ver_path + "/" + jar, "jar content", sha1="wrong")
+
+        handle_checksum_validation_http(
+            TEST_BUCKET, GA_PATH, None, self.report_dir,
+            recursive=True, skips=[GA_PATH + "/1.1/"]
+        )
+
+        self.assertEqual(
+            [GA_PATH + "/1.0/bar-1.0.jar"],
+            self.__read_report("mismatched_files.csv")
+        )
+        requested = [c.request.url for c in responses.calls]
+        self.assertNotIn(f"{ROOT_URL}/{GA_PATH}/1.1/", requested)
+
+    @responses.activate
+    def test_validation_download_error(self):
+        ver_path = GA_PATH + "/1.0"
+        jar_path = ver_path + "/bar-1.0.jar"
+        self.__mock_folder(ver_path, ["bar-1.0.jar", "bar-1.0.jar.sha1"])
+        responses.add(
+            responses.GET, f"{ROOT_URL}/{jar_path}.sha1", body=digest_content("jar")
+        )
+        responses.add(responses.GET, f"{ROOT_URL}/{jar_path}", status=500)
+
+        handle_checksum_validation_http(
+            TEST_BUCKET, ver_path, None, self.report_dir
+        )
+
+        with open(os.path.join(self.report_dir, "error_files.csv"), newline="") as f:
+            errors = list(csv.reader(f))
+        self.assertEqual(["path", "error"], errors[0])
+        self.assertEqual(2, len(errors))
+        self.assertEqual(jar_path, errors[1][0])
+        self.assertIn("500", errors[1][1])
+
+    @responses.activate
+    def test_validation_checksum_read_error(self):
+        ver_path = GA_PATH + "/1.0"
+        jar_path = ver_path + "/bar-1.0.jar"
+        self.__mock_folder(ver_path, ["bar-1.0.jar", "bar-1.0.jar.sha1"])
+        responses.add(
+            responses.GET, f"{ROOT_URL}/{jar_path}.sha1",
+            body=requests.ConnectionError("Connection refused")
+        )
+        responses.add(responses.GET, f"{ROOT_URL}/{jar_path}", body="jar")
+
+        handle_checksum_validation_http(
+            TEST_BUCKET, ver_path, None, self.report_dir
+        )
+
+        with open(os.path.join(self.report_dir, "error_files.csv"), newline="") as f:
+            errors = list(csv.reader(f))
+        self.assertEqual(
+            [["path", "error"], [jar_path, "Connection refused"]], errors
+        )
+        self.assertFalse(
+            os.path.exists(os.path.join(self.report_dir, "missing_checksum_files.csv"))
+        )
+
+    @responses.activate
+    def test_validation_with_leading_slash_path(self):
+        ver_path = GA_PATH + "/1.0"
+        self.__mock_folder(ver_path, ["bar-1.0.jar", "bar-1.0.jar.sha1"])
+        self.__mock_file(ver_path + "/bar-1.0.jar", "jar content", sha1="wrong")
+
+        handle_checksum_validation_http(
+            TEST_BUCKET, "/" + ver_path, None, self.report_dir
+        )
+
+        self.assertEqual(
+            ["/" + ver_path + "/bar-1.0.jar"],
+            self.__read_report("mismatched_files.csv")
+        )
+
+    def test_recursive_validation_deep_paths(self):
+        # The traversal is not recursive, so paths deeper than the
+        # python recursion limit should still be listed
+        depth = sys.getrecursionlimit() + 100
+        listed = []
+
+        def list_folder(_, folder_path):
+            listed.append(folder_path)
+            if len(listed) < depth:
+                return [os.path.join(folder_path, "d/")]
+            return []
+
+        (flexmock(checksum_http)
+         .should_receive("_list_folder_content")
+         .replace_with(list_folder))
+
+        handle_checksum_validation_http(
+            TEST_BUCKET, GA_PATH, None, self.report_dir, recursive=True
+        )
+
+        self.assertEqual(depth, len(listed))
+        self.assertEqual(GA_PATH + "/d" * (depth - 1) + "/", listed[-1])
+
+    @responses.activate
+    def test_validation_with_cache_file(self):
+        ver_path = GA_PATH + "/1.0"
+        jar_url = f"{ROOT_URL}/{ver_path}/bar-1.0.jar"
+        cache_file = os.path.join(self.tempdir, "cache", "checksums.json")
+        self.__mock_folder(ver_path, ["bar-1.0.jar", "bar-1.0.jar.sha1"])
+        responses.add(
+            responses.GET, jar_url + ".sha1", body=digest_content("jar content"),
+            headers={"ETag": '"s1"'}
+        )
+        responses.add(
+            responses.GET, jar_url, body="jar content", headers={"ETag": '"v1"'}
+        )
+
+        handle_checksum_validation_http(
+            TEST_BUCKET, ver_path, None, self.report_dir, cache_file=cache_file
+        )
+        self.assertTrue(os.path.isfile(cache_file))
+        self.assertEqual([], os.listdir(self.report_dir))
+
+        # Nothing changed: both the checksum file and the artifact get 304
+        responses.reset()
+        self.__mock_folder(ver_path, ["bar-1.0.jar", "bar-1.0.jar.sha1"])
+        responses.add(
+            responses.GET, jar_url + ".sha1", status=304,
+            match=[matchers.header_matcher({"If-None-Match": '"s1"'})]
+        )
+        responses.add(
+            responses.GET, jar_url, status=304,
+            match=[matchers.header_matcher({"If-None-Match": '"v1"'})]
+        )
+
+        handle_checksum_validation_http(
+            TEST_BUCKET, ver_path, None, self.report_dir, cache_file=cache_file
+        )
+        self.assertEqual([], os.listdir(self.report_dir))
+
+        # The checksum file changed, the unchanged artifact still gets 304
+        # and the mismatch is reported with its cached sha1
+        responses.reset()
+        self.__mock_folder(ver_path, ["bar-1.0.jar", "bar-1.0.jar.sha1"])
+        responses.add(
+            responses.GET, jar_url + ".sha1", body="changed", headers={"ETag": '"s2"'},
+            match=[matchers.header_matcher({"If-None-Match": '"s1"'})]
+        )
+        responses.add(
+            responses.GET, jar_url, status=304,
+            match=[matchers.header_matcher({"If-None-Match": '"v1"'})]
+        )
+
+        handle_checksum_validation_http(
+            TEST_BUCKET, ver_path, None, self.report_dir, cache_file=cache_file
+        )
+        self.assertEqual(
+            [ver_path + "/bar-1.0.jar"],
+            self.__read_report("mismatched_files.csv")
+        )
+
+    @responses.activate
+    def test_no_report_for_valid_files(self):
+        ver_path = GA_PATH + "/1.0"
+        self.__mock_folder(ver_path, ["bar-1.0.jar", "bar-1.0.jar.sha1"])
+        self.__mock_file(ver_path + "/bar-1.0.jar", "jar content")
+
+        handle_checksum_validation_http(
+            TEST_BUCKET, ver_path, None, self.report_dir
+        )
+
+        self.assertEqual([], os.listdir(self.report_dir))
+
+    def __mock_folder(self, path: str, items: List[str]):
+        links = "".join(
+            f'<li><a href="{i}" title="{i}">{i}</a></li>' for i in ["../"] + items
+        )
+        content = f'<html><body><ul id="contents">{links}</ul></body></html>'
+        for url in [f"{ROOT_URL}/{path}", f"{ROOT_URL}/{path}/"]:
+            responses.add(
+                responses.GET, url, body=content, content_type="text/html"
+            )
+
+    def __mock_file(self, path: str, content: str, sha1: str = ""):
+        url = f"{ROOT_URL}/{path}"
+        responses.add(responses.GET, url, body=content, content_type="text/plain")
+        if sha1 is None:
+            responses.add(responses.GET, url + ".sha1", status=404)
+        else:
+            sha1 = sha1 if sha1 else digest_content(content)
+            responses.add(responses.GET, url + ".sha1", body=sha1, content_type="text/plain")
+
+    def __read_report(self, name: str) -> List[str]:
+        with open(os.path.join(self.report_dir, name), encoding="utf-8") as f:
+            return [line for line in f.read().splitlines() if line]
+
+    def test_gen_report_escapes_errors(self):
+        errors = [
+            {"path": "org/foo/bar,1.0.jar", "error": "Failed, with \"quotes\"\nand lines"}
+        ]
+        _gen_report(self.report_dir, ([], [], errors))
+
+        with open(os.path.join(self.report_dir, "error_files.csv"), newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(
+            [["path", "error"], ["org/foo/bar,1.0.jar", "Failed, with \"quotes\"\nand lines"]],
+            rows
+        )
+
+    def test_gen_report_sorted(self):
+        mismatched = ["org/foo/bar/2.0/bar-2.0.jar", "org/foo/bar/1.0/bar-1.0.jar"]
+        missing = ["org/foo/bar/1.0/bar-1.0.pom", "org/foo/bar/1.0/bar-1.0-sources.jar"]
+        errors = [
+            {"path": "org/foo/bar/2.0/bar-2.0.pom", "error": "404"},
+            {"path": "org/foo/bar/1.0/bar-1.0.pom", "error": "500"}
+        ]
+        _gen_report(self.report_dir, (mismatched, missing, errors))
+
+        self.assertEqual(sorted(mismatched), self.__read_report("mismatched_files.csv"))
+        self.assertEqual(sorted(missing), self.__read_report("missing_checksum_files.csv"))
+        self.assertEqual(
+            ["path,error", "org/foo/bar/1.0/bar-1.0.pom,500", "org/foo/bar/2.0/bar-2.0.pom,404"],
+            self.__read_report("error_files.csv")
+        )
+
+    def test_parse_index_links(self):
+        content = """
+        <html><head><link href="style.css" rel="stylesheet"/></head>
+        <body><ul id="contents">
+          <li><a href="../">../</a></li>
+          <li><a class="folder" href="1.0/">1.0/</a></li>
+          <li><a data-href="ignored" href='bar-1.0.jar'>bar-1.0.jar</a></li>
+          <li><a href="bar&amp;baz.pom">bar&amp;baz.pom</a></li>
+          <li><a href="">empty</a></li>
+          <li><a href=2.0/>2.0/</a></li>
+          <li><a title="x>y" href="gt.jar">gt.jar</a></li>
+          <li><a title='href="no"' HREF='yes.jar'>yes.jar</a></li>
+          <!-- <li><a href="commented.jar">commented.jar</a></li> -->
+        </ul></body></html>
+        """
+        self.assertEqual(
+            [
+                GA_PATH + "/1.0/", GA_PATH + "/bar-1.0.jar", GA_PATH + "/bar&baz.pom",
+                GA_PATH + "/2.0/", GA_PATH + "/gt.jar", GA_PATH + "/yes.jar"
+            ],
+            _parse_index_links(content, GA_PATH)
+        )
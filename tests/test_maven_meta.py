@@ -108,3 +108,92 @@ class MavenMetadataTest(BaseTest):
         self.assertGreater(comp_class('1.0.1'), comp_class('1.0-m2'))
         self.assertGreater(comp_class('1.0.2-alpha'), comp_class('1.0.1-m2'))
         self.assertGreater(comp_class('1.0.2-alpha'), comp_class('1.0.1-alpha'))
+
+    def test_meta_versions_order(self):
+        meta = mvn.MavenMetadata(
+            "foo", "bar",
+            ["1.10.0", "1.0.1-alpha", "1.9.1", "1.0-m2", "1.0.1", "1.0.1-beta", "1.0.1"]
+        )
+        self.assertEqual(
+            ["1.0-m2", "1.0.1", "1.0.1-alpha", "1.0.1-beta", "1.9.1", "1.10.0"],
+            meta.versions
+        )
+        self.assertEqual("1.10.0", meta.latest_version)
+
+    def test_meta_last_upd_time(self):
+        meta = mvn.MavenMetadata("foo", "bar", ["1.0"], last_upd_time="20240101000000")
+        self.assertEqual("20240101000000", meta.last_upd_time)
+        self.assertIn(
+            "<lastUpdated>20240101000000</lastUpdated>", meta.generate_meta_file_content()
+        )
+        meta = mvn.MavenMetadata("foo", "bar", ["1.0"])
+        self.assertEqual(14, len(meta.last_upd_time))
+
+    def test_is_ignored(self):
+        patterns = [r"^\.index\.html$", r".*\.sha1$", "(?i)FOO.*", "(x)y", r"(a)\1"]
+        ignore_regexes = mvn._compile_ignore_patterns(patterns)
+        self.assertTrue(mvn._is_ignored(".index.html", ignore_regexes))
+        self.assertTrue(mvn._is_ignored("bar-1.0.jar.sha1", ignore_regexes))
+        self.assertTrue(mvn._is_ignored("maven-metadata.xml", ignore_regexes))
+        self.assertTrue(mvn._is_ignored("foo.jar", ignore_regexes))
+        self.assertTrue(mvn._is_ignored("aa", ignore_regexes))
+        self.assertFalse(mvn._is_ignored("bar-1.0.jar", ignore_regexes))
+        self.assertFalse(mvn._is_ignored("a.index.html", ignore_regexes))
+        # inline flags only apply to their own pattern
+        self.assertFalse(mvn._is_ignored("X.SHA1", ignore_regexes))
+        self.assertFalse(mvn._is_ignored("bar-1.0.jar.sha1", []))
+
+    def test_scan_paths(self):
+        files_root = os.path.join(self.tempdir, "tarball")
+        for path in [
+            "README.txt",
+            "repo/maven-repository/org/foo/bar/1.0/bar-1.0.pom",
+            "repo/maven-repository/org/foo/bar/1.0/bar-1.0.jar",
+            "repo/maven-repository/.index.html",
+            "repo/maven-repository-docs/guide.txt"
+        ]:
+            full_path = os.path.join(files_root, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(path)
+
+        (top_level, valid_mvn_paths, valid_poms, valid_dirs) = mvn._scan_paths(
+            files_root, [r"^\.index\.html$"], "maven-repository"
+        )
+
+        top = os.path.join(files_root, "repo", "maven-repository")
+        ver_dir = os.path.join(top, "org", "foo", "bar", "1.0")
+        self.assertEqual(top, top_level)
+        self.assertEqual(
+            sorted([os.path.join(ver_dir, "bar-1.0.pom"), os.path.join(ver_dir, "bar-1.0.jar")]),
+            sorted(valid_mvn_paths)
+        )
+        self.assertEqual([os.path.join(ver_dir, "bar-1.0.pom")], valid_poms)
+        self.assertEqual(
+            sorted([top, os.path.join(top, "org"), os.path.join(top, "org", "foo"),
+                    os.path.join(top, "org", "foo", "bar"), ver_dir]),
+            sorted(valid_dirs)
+        )
+
+    def test_add_uploaded_poms(self):
+        root = "/tmp/maven-repository"
+        ga_listings = [
+            ("org/foo/bar", ["org/foo/bar/1.0/bar-1.0.pom"], True),
+            ("org/foo/baz", [], True),
+            ("org/foo/qux", [], False)
+        ]
+        uploaded_poms = [
+            root + "/org/foo/bar/1.1/bar-1.1.pom",
+            root + "/org/foo/baz/2.0/baz-2.0.pom",
+            root + "/org/foo/qux/3.0/qux-3.0.pom"
+        ]
+        self.assertEqual(
+            [
+                ("org/foo/bar",
+                 ["org/foo/bar/1.0/bar-1.0.pom", "org/foo/bar/1.1/bar-1.1.pom"], True),
+                ("org/foo/baz", ["org/foo/baz/2.0/baz-2.0.pom"], True),
+                # failed listings still fail the metadata generation of the GA
+                ("org/foo/qux", [], False)
+            ],
+            mvn._add_uploaded_poms(ga_listings, uploaded_poms, root)
+        )
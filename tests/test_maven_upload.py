@@ -14,6 +14,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 from charon.pkgs.maven import handle_maven_uploading
+from charon.storage import S3Client
 from charon.utils.strings import remove_prefix
 from tests.base import SHORT_TEST_PREFIX, LONG_TEST_PREFIX, PackageBaseTest
 from tests.commons import (
@@ -24,7 +25,10 @@ from tests.commons import (
     COMMONS_CLIENT_META_NUM
 )
 from moto import mock_aws
+from flexmock import flexmock
+import charon.pkgs.maven as mvn
 import os
+import threading
 
 from tests.constants import INPUTS
 
@@ -110,6 +114,47 @@ class MavenUploadTest(PackageBaseTest):
         self.assertIn("<artifactId>httpclient</artifactId>", cat_content)
         self.assertIn("<groupId>org.apache.httpcomponents</groupId>", cat_content)
 
+    def test_upload_with_reported_failed_pom(self):
+        test_zip = os.path.join(INPUTS, "commons-client-4.5.6.zip")
+        handle_maven_uploading(
+            test_zip, "commons-client-4.5.6",
+            buckets=[('', TEST_BUCKET, '', '')],
+            dir_=self.tempdir, do_index=False
+        )
+
+        # The pom is uploaded, but reported as failed like when its copying
+        # to another target fails, and the GAs are listed before uploading
+        failed_pom = "org/apache/httpcomponents/httpclient/4.5.9/httpclient-4.5.9.pom"
+        listed = threading.Event()
+        list_ga_poms = mvn._list_ga_poms
+        upload_files = S3Client.upload_files
+
+        def list_before_upload(*args, **kwargs):
+            try:
+                return list_ga_poms(*args, **kwargs)
+            finally:
+                listed.set()
+
+        def upload_with_failure(**kwargs):
+            listed.wait(10)
+            failed = upload_files(S3Client(), **kwargs)
+            return failed + [p for p in kwargs["file_paths"] if p.endswith(failed_pom)]
+
+        flexmock(mvn).should_receive("_list_ga_poms").replace_with(list_before_upload)
+        flexmock(S3Client).should_receive("upload_files").replace_with(upload_with_failure)
+
+        test_zip = os.path.join(INPUTS, "commons-client-4.5.9.zip")
+        handle_maven_uploading(
+            test_zip, "commons-client-4.5.9",
+            buckets=[('', TEST_BUCKET, '', '')],
+            dir_=self.tempdir, do_index=False
+        )
+
+        meta_obj_client = self.test_bucket.Object(COMMONS_CLIENT_METAS[0])
+        meta_content_client = str(meta_obj_client.get()["Body"].read(), "utf-8")
+        self.assertIn("<version>4.5.6</version>", meta_content_client)
+        self.assertIn("<version>4.5.9</version>", meta_content_client)
+
     def test_ignore_upload(self):
         test_zip = os.path.join(INPUTS, "commons-client-4.5.6.zip")
         product_456 = "commons-client-4.5.6"
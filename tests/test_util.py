@@ -13,7 +13,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
-from charon.utils.files import digest, digest_content, read_sha1, HashType
+from charon.utils.files import digest, digest_all, digest_content, read_sha1, HashType
 import os
 import unittest
 
@@ -29,6 +29,17 @@ class UtilTest(unittest.TestCase):
             digest(test_file, HashType.SHA256),
         )
 
+    def test_digest_all(self):
+        test_file = os.path.join(INPUTS, "commons-lang3.zip")
+        digests = digest_all(test_file, [HashType.SHA1, HashType.SHA256, HashType.MD5])
+        self.assertEqual(3, len(digests))
+        self.assertEqual("bd4fe0a8111df64430b6b419a91e4218ddf44734", digests[HashType.SHA1])
+        self.assertEqual(
+            "61ff1d38cfeb281b05fcd6b9a2318ed47cd62c7f99b8a9d3e819591c03fe6804",
+            digests[HashType.SHA256],
+        )
+        self.assertEqual(digest(test_file, HashType.MD5), digests[HashType.MD5])
+
     def test_digest_content(self):
         test_content = "test common content"
         self.assertEqual("8c7b70f25fb88bc6a0372f70f6805132e90e2029", digest_content(test_content))